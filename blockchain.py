@@ -1,4 +1,12 @@
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from block import Block
+from transaction import Transaction
 import logging
+import os
+
+
+VERIFY_CHUNK_SIZE = 64  # Blocks handed to a worker process per round trip
 
 
 # Configure logging
@@ -6,17 +14,13 @@ logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(
 
 
 class BlockChain:
-    def __init__(self, chain):
-        self.chain = chain
-
-
     def is_chain_valid(self, chain):
         if not chain:
             logging.error("Chain is empty or null.")
             return False
     
-        if not chain[0].is_valid_hash() or chain[0].prev_hash != '0' * 64:
-            logging.error("Block 1: Invalid hash or invalid prev_hash")
+        if chain[0].prev_hash != '0' * 64:
+            logging.error("Block 1: Invalid prev_hash")
             return False
         
         for i in range(1, len(chain)):
@@ -25,14 +29,94 @@ class BlockChain:
             if current_block.prev_hash != previous_block.curr_hash:
                 logging.error(f"Block {current_block.block_number}: Invalid previous hash.")
                 return False
-            if current_block.curr_hash != current_block.calculate_hash():
-                logging.error(f"Block {current_block.block_number}: Hash does not match stored value.")
+
+        # Same per-block rules (hash, PoW, signatures) as gossiped blocks and chain files
+        for block in chain:
+            error = verify_block_data(block.to_dict())
+            if error:
+                logging.error(error)
                 return False
         return True
     
 
-    def add_block(self, block):
-        if len(self.chain) == 0 or block.prev_hash == self.chain[-1].curr_hash:
-            self.chain.append(block)
-        else:
-            logging.error("Block rejected due to invalid previous hash.")
\ No newline at end of file
+    def is_chain_data_valid(self, blocks_data, workers=None):
+        try:
+            verified = sum(1 for _ in self.verify_chain_data(blocks_data, workers))
+        except ValueError as e:
+            logging.error(str(e))
+            return False
+
+        if verified == 0:
+            logging.error("Chain is empty or null.")
+            return False
+        return True
+
+
+    def verify_chain_data(self, blocks_data, workers=None):
+        # blocks_data may be any iterable of block dicts (e.g. a file being streamed). Blocks are verified in
+        # bounded batches and yielded as Block objects built from the same dicts that were verified; a
+        # ValueError is raised at the first invalid block. Hash, PoW and signature checks fan out to worker
+        # processes, only the prev_hash linkage is checked here, in order.
+        workers = workers or os.cpu_count() or 1
+        blocks_data = iter(blocks_data)
+        prev_hash = '0' * 64
+
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            while True:
+                batch = list(islice(blocks_data, workers * VERIFY_CHUNK_SIZE * 4))
+                if not batch:
+                    break
+
+                for block_data in batch:
+                    if not isinstance(block_data, dict):
+                        raise ValueError("Malformed block: block must be a JSON object")
+                    if block_data.get('prev_hash') != prev_hash:
+                        raise ValueError(f"Block {block_data.get('block_number')}: Invalid previous hash.")
+                    prev_hash = block_data.get('curr_hash')
+
+                for error in executor.map(verify_block_data, batch, chunksize=VERIFY_CHUNK_SIZE):
+                    if error:
+                        raise ValueError(error)
+
+                # Every field was type-checked by verify_block_data, so from_dict cannot fall back to mining
+                for block_data in batch:
+                    yield Block.from_dict(block_data)
+
+
+def verify_block_data(block_data):
+    # Runs in a worker process: everything here depends on this block alone
+    error = check_block_fields(block_data)
+    if error:
+        return f"Block {block_data.get('block_number')}: Malformed block: {error}"
+
+    # Safe to build: curr_hash is present, so from_dict won't mine a replacement
+    block = Block.from_dict(block_data)
+    if block.curr_hash != block.calculate_hash():
+        return f"Block {block.block_number}: Hash does not match stored value."
+    if not block.is_valid_hash():
+        return f"Block {block.block_number}: Hash does not meet difficulty target."
+
+    for transaction_data in block.transactions:
+        if not Transaction.from_dict(transaction_data).is_valid():
+            return f"Block {block.block_number}: Invalid transaction signature."
+    return None
+
+
+def check_block_fields(block_data):
+    # A missing curr_hash would make Block.from_dict mine a fresh hash, which then trivially matches
+    if not isinstance(block_data, dict):
+        return "block must be a JSON object"
+    if not isinstance(block_data.get('curr_hash'), str) or not isinstance(block_data.get('prev_hash'), str):
+        return "curr_hash and prev_hash must be strings"
+    for field in ('block_number', 'nonce', 'timestamp'):
+        if type(block_data.get(field)) is not int:
+            return f"{field} must be an integer"
+    if not isinstance(block_data.get('transactions'), list) or not block_data['transactions']:
+        return "transactions must be a non-empty list"
+    for transaction_data in block_data['transactions']:
+        if not isinstance(transaction_data, dict) or 'amount' not in transaction_data:
+            return "transactions must be objects with an amount"
+        for field in ('sender', 'receiver', 'signature', 'sender_public_key'):
+            if not isinstance(transaction_data.get(field), str) or not transaction_data[field]:
+                return f"transaction {field} must be a non-empty string"
+    return None
\ No newline at end of file
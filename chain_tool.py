@@ -0,0 +1,87 @@
+from blockchain import BlockChain
+import argparse
+import requests
+import logging
+import json
+import sys
+
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+
+# Chain files are JSON Lines: one Block.to_dict() per line, in chain order
+def read_chain_file(path):
+    with open(path) as chain_file:
+        for line_number, line in enumerate(chain_file, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                block_data = json.loads(line)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"{path}:{line_number}: invalid JSON: {e}")
+            if not isinstance(block_data, dict):
+                raise ValueError(f"{path}:{line_number}: expected a JSON object, got {type(block_data).__name__}")
+            yield block_data
+
+
+def write_chain_file(path, blocks_data):
+    count = 0
+    with open(path, "w") as chain_file:
+        for block_data in blocks_data:
+            chain_file.write(json.dumps(block_data, sort_keys=True))
+            chain_file.write("\n")
+            count += 1
+    return count
+
+
+def verify_chain_file(path, workers=None):
+    return BlockChain().is_chain_data_valid(read_chain_file(path), workers)
+
+
+def load_chain_file(path, workers=None):
+    # Single pass: the blocks returned are built from exactly the data that was verified
+    chain = list(BlockChain().verify_chain_data(read_chain_file(path), workers))
+    if not chain:
+        raise ValueError(f"Chain file {path} is empty.")
+    return chain
+
+
+def export_chain(node_address, path):
+    response = requests.get(f"http://{node_address}/api/fetch/chain", timeout=30)
+    response.raise_for_status()
+    return write_chain_file(path, response.json())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Import, export and verify chain files (JSON Lines).")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    export_parser = subparsers.add_parser("export", help="Export a node's chain to a file")
+    export_parser.add_argument("node_address", help="HTTP address of the node, e.g. 127.0.0.1:5000")
+    export_parser.add_argument("path")
+
+    verify_parser = subparsers.add_parser("verify", help="Verify a chain file using all cores")
+    verify_parser.add_argument("path")
+    verify_parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+
+    args = parser.parse_args(argv)
+    try:
+        if args.command == "export":
+            count = export_chain(args.node_address, args.path)
+            logging.info(f"Exported {count} blocks from {args.node_address} to {args.path}")
+            return 0
+
+        if verify_chain_file(args.path, args.workers):
+            logging.info(f"Chain file {args.path} is valid.")
+            return 0
+        logging.error(f"Chain file {args.path} is invalid.")
+        return 1
+    except (OSError, ValueError, requests.exceptions.RequestException) as e:
+        logging.error(str(e))
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,9 +2,9 @@ from flask import Flask, jsonify, request
 import logging
 import socket
 import asyncio
-from blockchain import BlockChain
 from node import Node
 from server import Server
+from chain_tool import load_chain_file
 import threading
 import sys
 
@@ -16,7 +16,7 @@ logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(
 # Create a Flask instance
 app = Flask(__name__)
 hostname = socket.gethostname()
-node = Node(socket.gethostbyname(hostname), BlockChain([]), [], set(), set())
+node = Node(socket.gethostbyname(hostname), [], [], set(), set())
 
 
 # Define routes and their logic
@@ -39,7 +39,7 @@ def add_block():
 @app.route('/api/validate/chain')
 def validate_chain():
     try:
-        if node.blockchain.is_chain_valid(node.blockchain.chain):
+        if node.blockchain.is_chain_valid(node.chain):
             return jsonify({"message": "Chain validated successfully"})
         else:
             return jsonify({"message": "Chain is empty or it contains invalid blocks."})
@@ -125,16 +125,43 @@ def fetch_users():
     return jsonify(data), 200
 
 
+@app.route('/api/fetch/traces')
+def fetch_traces():
+    try:
+        trace_id = request.args.get('trace_id')
+        limit = request.args.get('limit')
+        if limit is not None:
+            if not limit.isdigit() or int(limit) <= 0:
+                raise ValueError("limit must be a positive integer")
+            limit = int(limit)
+        data = node.tracer.fetch(trace_id, limit)
+        return jsonify(data), 200
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": f"An unexpected error occurred: {str(e)}"}), 500
+
+
 def run_websocket(ws_port):
     server_instance = Server()
     asyncio.run(server_instance.start_server(node, ws_port))
         
 
 # Run the Flask app
+# Usage: python main.py <websocket_port> <seed_peer> [chain_file]
+# chain_file is a JSON Lines chain (see chain_tool.py export); it is verified and imported before syncing with peers
 if __name__ == "__main__":
     try:
         websocket_port = int(sys.argv[1])
-        node.peers.add(sys.argv[2])
+        node.add_peer(sys.argv[2])
+
+        if len(sys.argv) > 3:
+            try:
+                node.import_chain(load_chain_file(sys.argv[3]))
+            except (OSError, ValueError) as e:
+                logging.error(f"Failed to import chain from {sys.argv[3]}: {e}")
+                sys.exit(1)
+            logging.info(f"Imported {len(node.chain)} blocks from {sys.argv[3]}")
 
         # Start WebSocket server thread
         websocket_thread = threading.Thread(target=run_websocket, args=(websocket_port,))
@@ -1,12 +1,17 @@
 from block import Block
+from blockchain import BlockChain, verify_block_data
 from user import User
 from transaction import Transaction
+from subscription import SubscriptionManager
+from state import NodeState, StateWriter
+from tracing import Tracer
 from urllib.parse import urlparse
 import websockets
 import requests
 import logging
 import json
 import asyncio
+import time
 
 
 # Configure logging
@@ -14,31 +19,64 @@ logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(
 
 
 class Node:
-    def __init__(self, node_address, blockchain, pending_transactions, peers, users):
+    def __init__(self, node_address, chain, pending_transactions, peers, users):
         self.node_address = node_address
-        self.blockchain = blockchain
-        self.pending_transactions = pending_transactions
-        self.peers = peers
-        self.users = users
+        self.blockchain = BlockChain()
+        self.subscriptions = SubscriptionManager()
+        self.writer = StateWriter(NodeState(chain, pending_transactions, peers, users))
+        self.tracer = Tracer(node_address)
+
+
+    # All mutations go through self.writer; readers take the current immutable snapshot without locking.
+    # Take the snapshot once per operation when several fields must be consistent with each other.
+    @property
+    def snapshot(self):
+        return self.writer.state
+
+
+    @property
+    def chain(self):
+        return self.snapshot.chain
+
+
+    @property
+    def pending_transactions(self):
+        return self.snapshot.pending_transactions
+
+
+    @property
+    def peers(self):
+        return self.snapshot.peers
+
+
+    @property
+    def users(self):
+        return self.snapshot.users
 
 
     def add_block(self):
         self.sync_chain_from_peers()
-        if (len(self.blockchain.chain) == 0):
-            block = Block(1, self.pending_transactions, "0" * 64)
-        else:
-            block = Block(len(self.blockchain.chain) + 1, self.pending_transactions, self.blockchain.chain[-1].curr_hash)
+        snapshot = self.snapshot
+        trace_id = self.tracer.new_trace_id()
+        with self.tracer.span(trace_id, "mine", "new_block", block_number=len(snapshot.chain) + 1):
+            if (len(snapshot.chain) == 0):
+                block = Block(1, list(snapshot.pending_transactions), "0" * 64)
+            else:
+                block = Block(len(snapshot.chain) + 1, list(snapshot.pending_transactions), snapshot.chain[-1].curr_hash)
         
-        self.blockchain.add_block(block)
-        self.pending_transactions = []
+        # Mining happens outside the writer, so the chain may have moved on by the time the block is ready
+        with self.tracer.span(trace_id, "apply", "new_block") as details:
+            details["applied"] = self.writer.submit(self._apply_block, block)
+        if not details["applied"]:
+            raise ValueError("Block rejected: the chain advanced while mining.")
         logging.info("Block added successfully")
-        asyncio.run(self.broadcast_event("new_block", block.to_dict()))
-        asyncio.run(self.broadcast_event("empty_transactions", ""))
+        # Peers prune the block's transactions from their own pools when they apply it
+        asyncio.run(self.broadcast_event("new_block", block.to_dict(), trace_id))
         
 
     def sync_chain_from_peers(self):
         longest_chain = None
-        chain_length = len(self.blockchain.chain)
+        chain_length = len(self.chain)
 
         for peer in self.peers:
             try:
@@ -46,7 +84,8 @@ class Node:
                 response = requests.get(f"http://{peer}/api/fetch/chain")
                 peer_chain_data = response.json()
                 peer_chain = [Block.from_dict(block_data) for block_data in peer_chain_data]
-                logging.info(f"Response from peer: {peer}, chain: {[block.to_dict() for block in peer_chain]}")
+                logging.info(f"Response from peer: {peer}, chain length: {len(peer_chain)}")
+                logging.debug("Chain from peer %s: %s", peer, peer_chain_data)
 
                 if (len(peer_chain) > chain_length and self.blockchain.is_chain_valid(peer_chain)):
                     chain_length = len(peer_chain)
@@ -54,28 +93,38 @@ class Node:
             except:
                 logging.warning(f"Failed to sync with {peer}.")
         
-        if longest_chain:
-            self.blockchain.chain = longest_chain
+        if longest_chain and self.writer.submit(self._apply_longer_chain, longest_chain):
             logging.info("Blockchain updated from peer.")
+
+
+    def import_chain(self, chain):
+        if not self.writer.submit(self._apply_longer_chain, chain):
+            raise ValueError("Imported chain is not longer than the current chain.")
         
 
     def add_node(self, node_address):
         parsed_url = urlparse(node_address) #e.g. node_address = http://127.0.0.1:5000, then parsed_url=(scheme='http', netloc='127.0.0.1:5000', path='/', params = '', query='')
-        self.peers.add(parsed_url.netloc)
+        self.writer.submit(self._apply_peers, [parsed_url.netloc])
         logging.info(f"Node added successfully: {parsed_url.netloc}")
         asyncio.run(self.broadcast_event("new_node", parsed_url.netloc))
 
 
+    def add_peer(self, node_address):
+        self.writer.submit(self._apply_peers, [node_address])
+        logging.info(f"Peer added: {node_address}")
+
+
     def add_user(self, name):
         user = User(name)
-        self.users.add(user.get_wallet_address())
+        self.writer.submit(self._apply_users, [user.get_wallet_address()])
         logging.info("User added successfully")
         asyncio.run(self.broadcast_event("new_user", user.get_wallet_address()))
         return user.get_wallet_address()
 
 
     def add_transaction(self, sender_wallet_address, receiver_wallet_address, amount, signature, sender_public_key):
-        self.validate_and_add_transaction(sender_wallet_address, receiver_wallet_address, amount, signature, sender_public_key)
+        trace_id = self.tracer.new_trace_id()
+        self.validate_and_add_transaction(sender_wallet_address, receiver_wallet_address, amount, signature, sender_public_key, trace_id)
         logging.info("Transaction added successfully")
         transaction = {
             "sender_wallet_address": sender_wallet_address,
@@ -84,59 +133,85 @@ class Node:
             "signature": signature,
             "sender_public_key": sender_public_key
         }
-        asyncio.run(self.broadcast_event("new_transaction", transaction))
+        asyncio.run(self.broadcast_event("new_transaction", transaction, trace_id))
         
 
-    async def broadcast_event(self, event_name, data):
-        logging.info(f"Broadcasting event: {event_name}, data: {data}, peers: {self.peers}")
-        tasks = [self.send_event(peer, event_name, data) for peer in self.peers]
-        await asyncio.gather(*tasks)
+    async def broadcast_event(self, event_name, data, trace_id=None):
+        trace_id = trace_id or self.tracer.new_trace_id()
+        peers = self.peers
+        logging.info(f"Broadcasting event: {event_name}, trace: {trace_id}, peers: {peers}")
+        logging.debug("Broadcast %s payload: %s", event_name, data)
+
+        # Serialize once for all peers instead of once per send
+        with self.tracer.span(trace_id, "serialize", event_name) as details:
+            message = json.dumps({"event": event_name, "data": data, "trace_id": trace_id})
+            details["bytes"] = len(message)
+
+        with self.tracer.span(trace_id, "relay", event_name, peers=len(peers)):
+            tasks = [self.send_event(peer, event_name, message, trace_id) for peer in peers]
+            await asyncio.gather(*tasks)
 
 
     def fetch_chain(self):
-        return [block.to_dict() for block in self.blockchain.chain]
+        return [block.to_dict() for block in self.chain]
     
 
-    def process_add_transaction_event(self, sender_wallet_address, receiver_wallet_address, amount, signature, sender_public_key):
-        self.validate_and_add_transaction(sender_wallet_address, receiver_wallet_address, amount, signature, sender_public_key)
+    def process_add_transaction_event(self, sender_wallet_address, receiver_wallet_address, amount, signature, sender_public_key, trace_id=None):
+        self.validate_and_add_transaction(sender_wallet_address, receiver_wallet_address, amount, signature, sender_public_key, trace_id)
 
 
-    def validate_and_add_transaction(self, sender_wallet_address, receiver_wallet_address, amount, signature, sender_public_key):
-        if not sender_wallet_address in self.users or not receiver_wallet_address in self.users:
-            raise KeyError("sender or receiver wallet address are not correct")
+    def validate_and_add_transaction(self, sender_wallet_address, receiver_wallet_address, amount, signature, sender_public_key, trace_id=None):
+        with self.tracer.span(trace_id, "verify", "new_transaction") as details:
+            users = self.users
+            if not sender_wallet_address in users or not receiver_wallet_address in users:
+                details["valid"] = False
+                raise KeyError("sender or receiver wallet address are not correct")
 
-        transaction = Transaction(sender_wallet_address, receiver_wallet_address, amount, None, signature)
-        is_signature_valid = transaction.verify_signature(sender_wallet_address, receiver_wallet_address, amount, signature, sender_public_key)
-        if not is_signature_valid:
-            raise KeyError("invalid signature")
+            transaction = Transaction(sender_wallet_address, receiver_wallet_address, amount, None, signature, sender_public_key)
+            details["valid"] = transaction.is_valid()
+            if not details["valid"]:
+                raise KeyError("invalid signature")
         
-        self.pending_transactions.append(transaction.to_dict())
-
-
-    def process_add_block_event(self, block_number, block):
-        logging.info(f"Process add block event: {block}")
-        if (len(self.blockchain.chain) == block_number - 1):
-            self.blockchain.add_block(Block.from_dict(block))
+        with self.tracer.span(trace_id, "apply", "new_transaction"):
+            self.writer.submit(self._apply_transaction, transaction.to_dict())
+
+
+    def process_add_block_event(self, block_number, block, trace_id=None):
+        logging.info(f"Process add block event: {block_number}")
+        logging.debug("Block payload: %s", block)
+        if (len(self.chain) == block_number - 1):
+            with self.tracer.span(trace_id, "verify", "new_block", block_number=block_number) as details:
+                error = verify_block_data(block)
+                details["valid"] = error is None
+            if error:
+                logging.error(error)
+                return
+            new_block = Block.from_dict(block)
+            with self.tracer.span(trace_id, "apply", "new_block", block_number=block_number) as details:
+                details["applied"] = self.writer.submit(self._apply_block, new_block)
+        else:
+            self.tracer.record(trace_id, "apply", "new_block", block_number=block_number, applied=False)
 
 
     def process_add_node_event(self, node_address):
         logging.info(f"Process add node event: {node_address}")
         if (self.node_address != node_address):
-            self.peers.add(node_address)
+            self.writer.submit(self._apply_peers, [node_address])
 
 
     def process_add_user_event(self, user_wallet_address):
         logging.info(f"Process add user event: {user_wallet_address}")
-        self.users.add(user_wallet_address)
+        self.writer.submit(self._apply_users, [user_wallet_address])
 
 
+    # Kept so nodes running older versions, which still send empty_transactions after mining, are understood
     def process_empty_transactions_event(self):
         logging.info("Process empty transactions event")
-        self.pending_transactions = []
+        self.writer.submit(self._apply_empty_transactions)
 
         
     def sync_peers(self):
-        for peer in self.peers.copy():
+        for peer in self.peers:
             try:
                 logging.info(f"Syncing peer from node: {peer}")
                 response = requests.get(f"http://{peer}/api/fetch/peers", timeout=5)
@@ -144,7 +219,7 @@ class Node:
                 peers_data = response.json()
                 
                 if isinstance(peers_data, list):
-                    self.peers.update(peers_data)
+                    self.writer.submit(self._apply_peers, peers_data)
                     logging.info(f"Response from node: {peer}, peers: {peers_data}")
                 else:
                     logging.warning(f"Invalid peers data from {peer}: {peers_data}")
@@ -167,22 +242,84 @@ class Node:
                 logging.info(f"Syncing users from peer: {peer}")
                 response = requests.get(f"http://{peer}/api/fetch/users")
                 users_data = response.json()
-                logging.info(f"Response from peer: {peer}, users: {users_data}")
-                self.users.update(users_data)
+                logging.info(f"Response from peer: {peer}, users: {len(users_data)}")
+                logging.debug("Users from peer %s: %s", peer, users_data)
+                self.writer.submit(self._apply_users, users_data)
             except:
                 logging.warning(f"Failed to sync with {peer}.")
 
 
-    async def send_event(self, node_address, event, payload):
-        try:
-            parsed_url = urlparse(node_address)
-            host = parsed_url.hostname
-            port = int(parsed_url.path)
-            uri = f"ws://{host}:{port}"
-            async with websockets.connect(uri) as websocket:
-                message = json.dumps({"event": event, "data": payload})
-                await websocket.send(message)  # Send event
-                response = await asyncio.wait_for(websocket.recv(), timeout=5)
-                logging.info(f"Received from {node_address}: {response}")
-        except Exception as e:
-            logging.warning(f"Failed to send event {event} to {node_address}: {e}")
\ No newline at end of file
+    async def send_event(self, node_address, event, message, trace_id=None):
+        with self.tracer.span(trace_id, "send", event, peer=node_address) as details:
+            start = time.perf_counter()
+            try:
+                parsed_url = urlparse(node_address)
+                host = parsed_url.hostname
+                port = int(parsed_url.path)
+                uri = f"ws://{host}:{port}"
+                async with websockets.connect(uri) as websocket:
+                    details["connected_ms"] = round((time.perf_counter() - start) * 1000, 3)
+                    await websocket.send(message)  # Send event
+                    details["sent_ms"] = round((time.perf_counter() - start) * 1000, 3)
+                    response = await asyncio.wait_for(websocket.recv(), timeout=5)
+                    logging.debug("Received from %s: %s", node_address, response)
+                details["ok"] = True
+            except Exception as e:
+                details["ok"] = False
+                logging.warning(f"Failed to send event {event} to {node_address}: {e}")
+
+
+    # State commands: run only on the writer thread, take the current NodeState and return (new_state, result),
+    # optionally with a post-commit hook. They must stay cheap and free of I/O; mining, signature checks and
+    # network calls happen before submitting. Subscription pushes go in the hook so they leave in commit order.
+    def _apply_block(self, state, block):
+        expected_prev_hash = state.chain[-1].curr_hash if state.chain else "0" * 64
+        if block.prev_hash != expected_prev_hash:
+            logging.error("Block rejected due to invalid previous hash.")
+            return state, False
+        new_state = state.replace(chain=state.chain + (block,), pending_transactions=self._unconfirmed(state, [block]))
+        return new_state, True, lambda: self.subscriptions.publish_block(block)
+
+
+    def _apply_longer_chain(self, state, chain):
+        if len(chain) <= len(state.chain):
+            return state, False
+        # Push every block past the common prefix, so subscribers see each new head and confirmation
+        common = 0
+        while common < len(state.chain) and state.chain[common].curr_hash == chain[common].curr_hash:
+            common += 1
+        new_blocks = chain[common:]
+
+        def publish_new_blocks():
+            for block in new_blocks:
+                self.subscriptions.publish_block(block)
+        new_state = state.replace(chain=chain, pending_transactions=self._unconfirmed(state, new_blocks))
+        return new_state, True, publish_new_blocks
+
+
+    def _unconfirmed(self, state, blocks):
+        # Every node drops exactly the transactions a block confirms, so pools stay in step across the network
+        # and transactions admitted while a block was being mined are kept
+        confirmed = [transaction for block in blocks for transaction in block.transactions]
+        return tuple(transaction for transaction in state.pending_transactions if transaction not in confirmed)
+
+
+    def _apply_transaction(self, state, transaction):
+        new_state = state.replace(pending_transactions=state.pending_transactions + (transaction,))
+        return new_state, None, lambda: self.subscriptions.publish_transaction(transaction)
+
+
+    def _apply_empty_transactions(self, state):
+        return state.replace(pending_transactions=()), None
+
+
+    def _apply_peers(self, state, peers):
+        if state.peers.issuperset(peers):
+            return state, None
+        return state.replace(peers=state.peers.union(peers)), None
+
+
+    def _apply_users(self, state, users):
+        if state.users.issuperset(users):
+            return state, None
+        return state.replace(users=state.users.union(users)), None
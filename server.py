@@ -1,6 +1,9 @@
 import websockets
+import asyncio
 import json
+import time
 import logging
+from tracing import TRACED_EVENTS
 
 
 clients = set()
@@ -21,17 +24,24 @@ class Server:
         
         try:
             async for message in websocket:
-                logging.info(f"Received: {message}")
+                received_at = time.time()
+                logging.debug("Received: %s", message)
                 
                 try:
                     data = json.loads(message)  # Parse JSON
                     event_type = data.get("event")
                     payload = data.get("data")
+                    trace_id = None
+                    # Only gossip is traced, so client subscriptions can't push real traces out of the buffer.
+                    # Messages from peers without tracing get a local trace id so their hops can still be grouped.
+                    if event_type in TRACED_EVENTS:
+                        trace_id = data.get("trace_id") or node.tracer.new_trace_id()
+                        node.tracer.record(trace_id, "receive", event_type, received_at, peer=str(websocket.remote_address), bytes=len(message))
                     
-                    logging.info(f"Event: {event_type}, Payload: {payload}")
+                    logging.info(f"Event: {event_type}, trace: {trace_id}")
 
                     if event_type == "new_block":
-                        node.process_add_block_event(payload['block_number'], payload)
+                        node.process_add_block_event(payload['block_number'], payload, trace_id)
 
                     elif event_type == "new_transaction":
                         node.process_add_transaction_event(
@@ -39,7 +49,8 @@ class Server:
                             payload['receiver_wallet_address'],
                             payload['amount'],
                             payload['signature'],
-                            payload['sender_public_key']
+                            payload['sender_public_key'],
+                            trace_id
                         )
 
                     elif event_type == "new_node":
@@ -51,6 +62,23 @@ class Server:
                     elif event_type == "empty_transactions":
                         node.process_empty_transactions_event()
 
+                    elif event_type == "subscribe":
+                        try:
+                            if not isinstance(payload, dict):
+                                raise ValueError("data must be an object")
+                            node.subscriptions.subscribe(websocket, payload['topic'], payload.get('addresses'))
+                            await websocket.send(json.dumps({"event": "subscribed", "data": payload['topic']}))
+                        except (KeyError, TypeError, ValueError) as e:
+                            await websocket.send(json.dumps({"event": "error", "data": f"Invalid subscription: {e}"}))
+
+                    elif event_type == "unsubscribe":
+                        if payload is not None and not isinstance(payload, dict):
+                            await websocket.send(json.dumps({"event": "error", "data": "Invalid unsubscription: data must be an object"}))
+                        else:
+                            topic = payload.get('topic') if payload else None
+                            node.subscriptions.unsubscribe(websocket, topic)
+                            await websocket.send(json.dumps({"event": "unsubscribed", "data": topic}))
+
                     else:
                         await websocket.send(json.dumps({"event": "error", "data": "Unknown event"}))
 
@@ -60,12 +88,15 @@ class Server:
                 
         except websockets.exceptions.ConnectionClosed:
             logging.info("Client disconnected")
-            clients.remove(websocket)  # Remove client when disconnected
+        finally:
+            clients.discard(websocket.remote_address)  # Remove client when disconnected, whether the close was clean or not
+            node.subscriptions.remove(websocket)
 
 
     async def start_server(self, blockchain_node, ws_port):
         global node, clients
         node = blockchain_node
+        node.subscriptions.bind_loop(asyncio.get_running_loop())
         clients.update(node.peers)
         node.sync_peers()
         node.sync_users()
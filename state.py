@@ -0,0 +1,64 @@
+from concurrent.futures import Future
+import threading
+import logging
+import queue
+
+
+class NodeState:
+    __slots__ = ("chain", "pending_transactions", "peers", "users")
+
+    def __init__(self, chain=(), pending_transactions=(), peers=frozenset(), users=frozenset()):
+        object.__setattr__(self, "chain", tuple(chain))
+        object.__setattr__(self, "pending_transactions", tuple(pending_transactions))
+        object.__setattr__(self, "peers", frozenset(peers))
+        object.__setattr__(self, "users", frozenset(users))
+
+
+    def __setattr__(self, name, value):
+        raise AttributeError("NodeState is immutable; use replace() to derive a new state.")
+
+
+    def replace(self, **changes):
+        # Copy-on-write: fields that are not changed are shared with the previous snapshot
+        fields = {name: getattr(self, name) for name in self.__slots__}
+        fields.update(changes)
+        return NodeState(**fields)
+
+
+class StateWriter:
+    def __init__(self, initial_state):
+        self.state = initial_state
+        self.commands = queue.Queue()
+        self.thread = threading.Thread(target=self.run, name="state-writer", daemon=True)
+        self.thread.start()
+
+
+    def submit(self, command, *args):
+        # command(state, *args) must return (new_state, result) or (new_state, result, on_commit) and must not
+        # block on I/O. on_commit runs on the writer right after the swap, so its side effects happen in commit order.
+        if threading.current_thread() is self.thread:
+            return self.apply(command, *args)
+        future = Future()
+        self.commands.put((command, args, future))
+        return future.result()
+
+
+    def apply(self, command, *args):
+        new_state, result, *on_commit = command(self.state, *args)
+        self.state = new_state  # A single reference swap publishes the new snapshot to readers
+        for hook in on_commit:
+            try:
+                hook()
+            except Exception as e:
+                # The state is already committed; a failing hook must not make the caller think otherwise
+                logging.error(f"Post-commit hook for {getattr(command, '__name__', command)} failed: {e}")
+        return result
+
+
+    def run(self):
+        while True:
+            command, args, future = self.commands.get()
+            try:
+                future.set_result(self.apply(command, *args))
+            except Exception as e:
+                future.set_exception(e)  # Re-raised in the submitting thread; the state is left unchanged
@@ -0,0 +1,136 @@
+import websockets
+import asyncio
+import json
+import logging
+
+
+MAX_PENDING_PUSHES = 256  # Per-subscriber queue size before it is treated as a slow consumer
+TOPICS = ("new_heads", "new_transactions", "addresses")
+
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+
+class Subscriber:
+    def __init__(self, websocket):
+        self.websocket = websocket
+        self.topics = set()
+        self.addresses = set()
+        self.queue = asyncio.Queue(maxsize=MAX_PENDING_PUSHES)
+        self.pump_task = None
+
+
+    def wants(self, topic, addresses=None):
+        if topic not in self.topics:
+            return False
+        if topic == "addresses":
+            return bool(self.addresses.intersection(addresses or ()))
+        return True
+
+
+class SubscriptionManager:
+    def __init__(self):
+        self.subscribers = {}
+        self.loop = None
+
+
+    def bind_loop(self, loop):
+        # Pushes are produced on the Flask thread but delivered on the WebSocket event loop
+        self.loop = loop
+
+
+    def subscribe(self, websocket, topic, addresses=None):
+        if topic not in TOPICS:
+            raise ValueError(f"Unknown topic: {topic}")
+        if topic == "addresses" and not addresses:
+            raise ValueError("addresses topic requires a non-empty list of wallet addresses")
+        if addresses is not None and (not isinstance(addresses, list) or not all(isinstance(address, str) for address in addresses)):
+            raise ValueError("addresses must be a list of wallet address strings")
+
+        subscriber = self.subscribers.get(websocket)
+        if subscriber is None:
+            subscriber = Subscriber(websocket)
+            subscriber.pump_task = asyncio.create_task(self._pump(subscriber))
+            self.subscribers[websocket] = subscriber
+
+        subscriber.topics.add(topic)
+        if addresses:
+            subscriber.addresses.update(addresses)
+        logging.info(f"Subscribed {websocket.remote_address} to {topic}")
+
+
+    def unsubscribe(self, websocket, topic=None):
+        subscriber = self.subscribers.get(websocket)
+        if subscriber is None:
+            return
+        if topic is None:
+            subscriber.topics.clear()
+        else:
+            subscriber.topics.discard(topic)
+            if topic == "addresses":
+                subscriber.addresses.clear()
+        if not subscriber.topics:
+            self.remove(websocket)
+
+
+    def remove(self, websocket):
+        subscriber = self.subscribers.pop(websocket, None)
+        if subscriber and subscriber.pump_task and subscriber.pump_task is not asyncio.current_task():
+            subscriber.pump_task.cancel()
+
+
+    async def _pump(self, subscriber):
+        try:
+            while True:
+                message = await subscriber.queue.get()
+                await subscriber.websocket.send(message)
+        except websockets.exceptions.ConnectionClosed:
+            # The client went away mid-push; end the task cleanly instead of leaving an unretrieved exception
+            self.remove(subscriber.websocket)
+
+
+    def publish(self, topic, data, addresses=None):
+        if self.loop is None or not self.subscribers:
+            return
+        # Serialize once here, fan the same string out to every matching subscriber
+        message = json.dumps({"event": topic, "data": data})
+        self.loop.call_soon_threadsafe(self._deliver, topic, message, addresses)
+
+
+    def publish_block(self, block):
+        header = {
+            "block_number": block.block_number,
+            "prev_hash": block.prev_hash,
+            "curr_hash": block.curr_hash,
+            "nonce": block.nonce,
+            "timestamp": block.timestamp,
+            "transaction_count": len(block.transactions)
+        }
+        self.publish("new_heads", header)
+        for transaction in block.transactions:
+            self.publish_address_activity(transaction, "confirmed", block.block_number)
+
+
+    def publish_transaction(self, transaction):
+        self.publish("new_transactions", transaction)
+        self.publish_address_activity(transaction, "pending")
+
+
+    def publish_address_activity(self, transaction, status, block_number=None):
+        addresses = {transaction["sender"], transaction["receiver"]}
+        activity = {"status": status, "block_number": block_number, "transaction": transaction}
+        self.publish("addresses", activity, addresses)
+
+
+    def _deliver(self, topic, message, addresses):
+        for websocket, subscriber in list(self.subscribers.items()):
+            if not subscriber.wants(topic, addresses):
+                continue
+            try:
+                subscriber.queue.put_nowait(message)
+            except asyncio.QueueFull:
+                # Slow consumer: drop it rather than buffering without bound or stalling other subscribers
+                logging.warning(f"Dropping slow subscriber {websocket.remote_address}")
+                self.remove(websocket)
+                asyncio.ensure_future(websocket.close(code=1008, reason="Subscriber too slow"))
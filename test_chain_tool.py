@@ -0,0 +1,47 @@
+from ecdsa import SigningKey, SECP256k1
+from blockchain import BlockChain
+from block import Block
+from node import Node
+import chain_tool
+
+
+def make_node(*wallet_addresses):
+    return Node("127.0.0.1", [], [], set(), set(wallet_addresses))
+
+
+def signed_transaction(signing_key, sender, receiver, amount):
+    signature = signing_key.sign(f"{sender}{receiver}{amount}".encode()).hex()
+    return sender, receiver, amount, signature, signing_key.get_verifying_key().to_string().hex()
+
+
+def mine_chain(node, blocks):
+    client_key = SigningKey.generate(curve=SECP256k1)
+    for amount in range(1, blocks + 1):
+        node.add_transaction(*signed_transaction(client_key, "alice", "bob", amount))
+        node.add_block()
+    return node.fetch_chain()
+
+
+def test_mined_chain_round_trips_through_chain_file(tmp_path):
+    node = make_node("alice", "bob")
+    path = tmp_path / "chain.jsonl"
+
+    assert chain_tool.write_chain_file(path, mine_chain(node, 2)) == 2
+    assert chain_tool.verify_chain_file(path, workers=2)
+    assert [block.curr_hash for block in chain_tool.load_chain_file(path)] == [block.curr_hash for block in node.chain]
+
+
+def test_block_with_empty_signature_is_invalid():
+    # Mined with the empty signature in place, so only the transaction check can reject it
+    transaction = {"sender": "alice", "receiver": "bob", "amount": 1, "signature": "", "sender_public_key": "00"}
+    block = Block(1, [transaction], "0" * 64)
+
+    assert not BlockChain().is_chain_data_valid([block.to_dict()], workers=1)
+
+
+def test_cli_rejects_non_object_lines(tmp_path):
+    path = tmp_path / "chain.jsonl"
+    path.write_text("[1, 2]\n")
+
+    assert chain_tool.main(["verify", str(path)]) == 1
+
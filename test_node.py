@@ -0,0 +1,59 @@
+from ecdsa import SigningKey, SECP256k1
+from blockchain import BlockChain
+from block import Block
+from node import Node
+
+
+def make_node(*wallet_addresses):
+    return Node("127.0.0.1", [], [], set(), set(wallet_addresses))
+
+
+def signed_transaction(signing_key, sender, receiver, amount):
+    signature = signing_key.sign(f"{sender}{receiver}{amount}".encode()).hex()
+    return sender, receiver, amount, signature, signing_key.get_verifying_key().to_string().hex()
+
+
+def test_applying_a_block_prunes_only_its_transactions():
+    client_key = SigningKey.generate(curve=SECP256k1)
+    miner = make_node("alice", "bob")
+    peer = make_node("alice", "bob")
+    first = signed_transaction(client_key, "alice", "bob", 1)
+    second = signed_transaction(client_key, "alice", "bob", 2)
+
+    for node in (miner, peer):
+        node.add_transaction(*first)
+    miner.add_block()
+    # Admitted on both nodes after the block was mined but before the peer applied it
+    for node in (miner, peer):
+        node.add_transaction(*second)
+    peer.process_add_block_event(1, miner.fetch_chain()[0])
+
+    assert len(peer.chain) == 1
+    assert peer.pending_transactions == miner.pending_transactions
+    assert [transaction["amount"] for transaction in peer.pending_transactions] == [2]
+
+
+def test_gossip_and_sync_apply_the_same_rules():
+    client_key = SigningKey.generate(curve=SECP256k1)
+    miner = make_node("alice", "bob")
+    miner.add_transaction(*signed_transaction(client_key, "alice", "bob", 1))
+    miner.add_block()
+    peer = make_node("alice", "bob")
+
+    peer.process_add_block_event(1, miner.fetch_chain()[0])
+
+    assert [block.curr_hash for block in peer.chain] == [block.curr_hash for block in miner.chain]
+    assert BlockChain().is_chain_valid(list(miner.chain))
+
+
+def test_gossip_and_sync_both_reject_a_forged_signature():
+    sender, receiver, amount, signature, _ = signed_transaction(SigningKey.generate(curve=SECP256k1), "alice", "bob", 1)
+    forger_key = SigningKey.generate(curve=SECP256k1).get_verifying_key().to_string().hex()
+    transaction = {"sender": sender, "receiver": receiver, "amount": amount, "signature": signature, "sender_public_key": forger_key}
+    block = Block(1, [transaction], "0" * 64)
+    peer = make_node("alice", "bob")
+
+    peer.process_add_block_event(1, block.to_dict())
+
+    assert peer.chain == ()
+    assert not BlockChain().is_chain_valid([block])
@@ -0,0 +1,54 @@
+from collections import deque
+from contextlib import contextmanager
+import time
+import uuid
+
+
+TRACE_BUFFER_SIZE = 4096  # Most recent hop records kept in memory per node
+TRACED_EVENTS = ("new_block", "new_transaction", "new_node", "new_user", "empty_transactions")  # Gossip only
+
+
+class Tracer:
+    def __init__(self, node_address, size=TRACE_BUFFER_SIZE):
+        self.node_address = node_address
+        self.records = deque(maxlen=size)  # Ring buffer: appends are thread-safe and old records fall off
+
+
+    @staticmethod
+    def new_trace_id():
+        return uuid.uuid4().hex
+
+
+    def record(self, trace_id, stage, event, started_at=None, duration_ms=None, **details):
+        # Wall-clock timestamps so hops recorded on different nodes can be lined up
+        self.records.append({
+            "trace_id": trace_id,
+            "stage": stage,
+            "event": event,
+            "node": self.node_address,
+            "timestamp": started_at if started_at is not None else time.time(),
+            "duration_ms": duration_ms,
+            **details
+        })
+
+
+    @contextmanager
+    def span(self, trace_id, stage, event, **details):
+        started_at = time.time()
+        start = time.perf_counter()
+        try:
+            yield details
+        finally:
+            duration_ms = round((time.perf_counter() - start) * 1000, 3)
+            self.record(trace_id, stage, event, started_at, duration_ms, **details)
+
+
+    def fetch(self, trace_id=None, limit=None):
+        if limit is not None and limit <= 0:
+            raise ValueError("limit must be a positive integer")
+        records = list(self.records)
+        if trace_id:
+            records = [record for record in records if record["trace_id"] == trace_id]
+        if limit:
+            records = records[-limit:]
+        return records
@@ -2,11 +2,13 @@ from ecdsa import VerifyingKey, SECP256k1
 
 
 class Transaction:
-    def __init__(self, sender, receiver, amount, sender_private_key, signature):
+    def __init__(self, sender, receiver, amount, sender_private_key, signature, sender_public_key=None):
         self.sender = sender
         self.receiver = receiver
         self.amount = amount
-        if not signature:
+        self.sender_public_key = sender_public_key
+        # Only sign when a key is given; an empty signature from the network must fail verification, not signing
+        if not signature and sender_private_key:
             self.signature = self.sign_transaction(sender_private_key)
         else:
             self.signature = signature
@@ -26,10 +28,28 @@ class Transaction:
             return False
 
 
+    def is_valid(self):
+        # The one signature rule, used both when admitting to the pending pool and when verifying blocks
+        return self.verify_signature(self.sender, self.receiver, self.amount, self.signature, self.sender_public_key)
+
+
     def to_dict(self):
         return {
             "sender": self.sender,
             "receiver": self.receiver,
             "amount": self.amount,
-            "signature": self.signature
-        }
\ No newline at end of file
+            "signature": self.signature,
+            "sender_public_key": self.sender_public_key
+        }
+
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(
+            sender = data['sender'],
+            receiver = data['receiver'],
+            amount = data['amount'],
+            sender_private_key = None,
+            signature = data['signature'],
+            sender_public_key = data['sender_public_key']
+        )
\ No newline at end of file